@@ -2,28 +2,62 @@
 """
 Run:      python refresh.py
 Requires: ODDS_API_KEY in .env
-          models/player_points.joblib   (trained earlier)
+          models/player_points.joblib   (trained earlier; linear models are
+                                         exported to models/*.npz on first run)
 Output:   Top 20 player-points edges (table + JSON)
 """
 
-import os, joblib, requests, pandas as pd
+import os, joblib, orjson, requests, numpy as np, pandas as pd
 import re
 import logging
 import argparse
 import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import NamedTuple
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def load_table(parquet_path: str) -> pd.DataFrame:
+    """Load a player table from its Feather copy, creating it on first use.
+
+    The Feather file sits next to the parquet source with PLAYER_NAME stored
+    as a categorical column; it is rebuilt whenever the parquet is newer.
+    If the copy cannot be written, the parquet frame is used as-is.
+    """
+    feather_path = os.path.splitext(parquet_path)[0] + ".feather"
+    if (os.path.exists(feather_path)
+            and os.path.getmtime(feather_path) >= os.path.getmtime(parquet_path)):
+        return pd.read_feather(feather_path, use_threads=True)
+    df = (pd.read_parquet(parquet_path)
+            .astype({"PLAYER_NAME": "category"})
+            .reset_index(drop=True))
+    tmp = f"{feather_path}.{os.getpid()}.tmp"
+    try:
+        df.to_feather(tmp)
+        os.replace(tmp, feather_path)   # atomic, so readers never see a partial file
+    except (OSError, ImportError, ValueError) as e:
+        logging.warning("Could not write %s (%s); using %s directly.", feather_path, e, parquet_path)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return df
 
 try:
-    TRAIN_LOGS = pd.read_parquet("data/player_logs.parquet")
+    TRAIN_LOGS = load_table("data/player_logs.parquet")
 except FileNotFoundError as e:
     raise SystemExit("❌  data/player_logs.parquet missing; ensure the training data exists.") from e
 
 try:
-    LAST5 = pd.read_parquet("cache/last5.parquet")
+    LAST5 = load_table("cache/last5.parquet")
 except FileNotFoundError as e:
     raise SystemExit("❌  cache/last5.parquet missing; generate the rolling-5 averages first.") from e
 
+# "(…)" groups or any single non-letter/non-space char, removed in one pass
+_CLEAN_RE = re.compile(r"\([^)]*\)|[^A-Za-z\s]")
+
 def clean_name(name: str) -> str:
     """
     Normalize player names so Odds-API and nba_api match:
@@ -31,43 +65,184 @@ def clean_name(name: str) -> str:
     • remove punctuation               e.g.  "J. Harden"         → "J Harden"
     • lower-case + strip spaces
     """
-    name = re.sub(r"\([^)]*\)", "", name)            # strip "(…)"
-    name = re.sub(r"[^A-Za-z\s]", "", name)          # keep letters & spaces
+    name = _CLEAN_RE.sub("", name)                   # strip "(…)", keep letters & spaces
     return name.lower().strip()
+
+def clean_series(s: pd.Series) -> pd.Series:
+    """Vectorized ``clean_name`` for a whole column of player names."""
+    return (s.str.replace(_CLEAN_RE, "", regex=True)
+             .str.lower()
+             .str.strip())
 # ── Load secrets & model ──────────────────────────────────────────────
 load_dotenv()
 ODDS_KEY = os.getenv("ODDS_API_KEY")
 if not ODDS_KEY:
     raise SystemExit("❌  ODDS_API_KEY missing; add it to .env")
 
+# sklearn estimators whose predict() is exactly X @ coef_ + intercept_
+# (unlike GLMs such as PoissonRegressor, which apply a link function)
+_AFFINE_MODELS = frozenset({"LinearRegression", "Ridge", "RidgeCV", "Lasso", "LassoCV",
+                            "ElasticNet", "ElasticNetCV", "BayesianRidge", "ARDRegression"})
+
+class LinearModel(NamedTuple):
+    """Coefficients of a linear model exported to ``.npz``; no sklearn needed."""
+    coef_: np.ndarray
+    intercept_: np.float32
+
+def load_model(name: str) -> tuple:
+    """Return ``(model, features)`` for ``models/<name>``.
+
+    Linear models are read from ``models/<name>.npz`` when it is at least as
+    new as the joblib bundle; otherwise the bundle is unpickled and, if the
+    model is a single-target affine regressor (see ``_AFFINE_MODELS``), its
+    float32 coef/intercept are exported for next time. An unreadable
+    ``.npz`` falls back to the bundle, and a failed export only logs a
+    warning.
+    """
+    npz_path, bundle_path = f"models/{name}.npz", f"models/{name}.joblib"
+    if os.path.exists(npz_path) and (not os.path.exists(bundle_path)
+                                     or os.path.getmtime(npz_path) >= os.path.getmtime(bundle_path)):
+        try:
+            with np.load(npz_path) as params:
+                return (LinearModel(params["coef"], np.float32(params["intercept"])),
+                        params["features"].tolist())
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logging.warning("Could not read %s (%s); loading %s instead.", npz_path, e, bundle_path)
+
+    bundle = joblib.load(bundle_path)
+    model, feats = bundle["model"], bundle["features"]
+    if (type(model).__module__.startswith("sklearn.")
+            and type(model).__name__ in _AFFINE_MODELS
+            and np.ndim(model.coef_) == 1 and np.ndim(model.intercept_) == 0):
+        model = LinearModel(model.coef_.astype(np.float32), np.float32(model.intercept_))
+        tmp = f"{npz_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:   # file object, so numpy doesn't append ".npz"
+                np.savez(f, coef=model.coef_, intercept=model.intercept_,
+                         features=np.array(feats))
+            os.replace(tmp, npz_path)   # atomic, so readers never see a partial file
+        except OSError as e:
+            logging.warning("Could not write %s (%s); using the in-memory model.", npz_path, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return model, feats
+
 # Load models for points, rebounds, and assists
 try:
-    POINTS_MODEL_BUNDLE = joblib.load("models/player_points.joblib")
-    REBOUNDS_MODEL_BUNDLE = joblib.load("models/player_rebounds.joblib")
-    ASSISTS_MODEL_BUNDLE = joblib.load("models/player_assists.joblib")
+    POINTS_MODEL, POINTS_FEATS = load_model("player_points")
+    REBOUNDS_MODEL, REBOUNDS_FEATS = load_model("player_rebounds")
+    ASSISTS_MODEL, ASSISTS_FEATS = load_model("player_assists")
 except FileNotFoundError as e:
     raise SystemExit("❌  One or more model files are missing in the models/ directory.") from e
 
-POINTS_MODEL, POINTS_FEATS = POINTS_MODEL_BUNDLE["model"], POINTS_MODEL_BUNDLE["features"]
-REBOUNDS_MODEL, REBOUNDS_FEATS = REBOUNDS_MODEL_BUNDLE["model"], REBOUNDS_MODEL_BUNDLE["features"]
-ASSISTS_MODEL, ASSISTS_FEATS = ASSISTS_MODEL_BUNDLE["model"], ASSISTS_MODEL_BUNDLE["features"]
+def predict(model, X: pd.DataFrame) -> np.ndarray:
+    """Predict with ``model``, bypassing sklearn's predict path for linear models.
+
+    With ``return_std=False`` BayesianRidge.predict is just ``X @ coef_ +
+    intercept_``, which is all a ``LinearModel`` carries; any other
+    estimator falls back to its own ``predict``.
+    """
+    if not isinstance(model, LinearModel):
+        return model.predict(X)
+    return X.to_numpy(dtype=np.float32, copy=False) @ model.coef_ + model.intercept_
 
 # season-average points per player (static lookup from training data)
-TRAIN_LOGS = pd.read_parquet("data/player_logs.parquet")
-SEASON_PTS = TRAIN_LOGS.groupby("PLAYER_NAME").PTS.mean()
+SEASON_PTS = TRAIN_LOGS.groupby("PLAYER_NAME", observed=True).PTS.mean()
+
+# cleaned-name lookups, built once at import instead of on every refresh
+MEMORY = joblib.Memory("cache/joblib", verbose=0)
+
+@MEMORY.cache
+def season_pts_by_clean(parquet_mtime: float, clean_pattern: str) -> pd.Series:
+    """Season-average points keyed by cleaned name, cached on disk.
+
+    Both arguments only serve as the cache key: joblib hashes this
+    function's own source, not ``clean_series``, so the cleaning pattern is
+    passed in to recompute the lookup when either the training logs or the
+    name-cleaning rule change.
+    """
+    return TRAIN_LOGS.groupby(clean_series(TRAIN_LOGS["PLAYER_NAME"]))["PTS"].mean()
+
+SEASON_PTS_BY_CLEAN = season_pts_by_clean(os.path.getmtime("data/player_logs.parquet"),
+                                          _CLEAN_RE.pattern)
+LAST5_CLEAN = pd.Series(LAST5["rolling5_pts"].to_numpy(),
+                        index=pd.Index(clean_series(LAST5["PLAYER_NAME"]), name="clean_player"),
+                        name="rolling5_pts")
+LAST5_CLEAN = LAST5_CLEAN[~LAST5_CLEAN.index.duplicated()]
 
 # ── Odds API helpers ──────────────────────────────────────────────────
 BASE = "https://api.the-odds-api.com/v4/sports/basketball_nba"
+MARKETS = ("player_points", "player_rebounds", "player_assists")
+MAX_WORKERS = 16
+ODDS_CACHE_DIR = "cache/odds"
+ODDS_CACHE_TTL = 300   # seconds a cached per-event shard (all requested markets) stays fresh
+
+# one pooled session so per-event calls reuse TCP/TLS connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                                      max_retries=Retry(total=3, backoff_factor=0.3)))
+
+def _json(r: requests.Response):
+    """Decode a response body with orjson rather than the stdlib decoder."""
+    return orjson.loads(r.content)
 
 def today_events():
     """Return today's NBA events from the Odds API as raw JSON."""
-    r = requests.get(f"{BASE}/events",
-                     params={"apiKey": ODDS_KEY, "dateFormat": "iso"},
-                     timeout=20)
+    r = SESSION.get(f"{BASE}/events",
+                    params={"apiKey": ODDS_KEY, "dateFormat": "iso"},
+                    timeout=20)
     r.raise_for_status()
-    return r.json()
+    return _json(r)
+
+# column-oriented prop rows: (players, lines, prices, games, markets)
+PropColumns = tuple[list[str], list[float], list[float], list[str], list[str]]
+
+def player_props_multi(event_id: str, game_label: str,
+                       markets: tuple[str, ...] = MARKETS) -> PropColumns:
+    """Return player prop lines for several markets from a single request.
 
-def player_props(event_id: str, game_label: str, market: str) -> list[dict]:
+    Parameters
+    ----------
+    event_id: str
+        Odds API event identifier.
+    game_label: str
+        Human readable game label.
+    markets: tuple[str, ...]
+        Market keys such as ``"player_points"`` or ``"player_rebounds"``;
+        they are sent comma-joined in one ``/odds`` call.
+
+    Returns
+    -------
+    PropColumns
+        Parallel ``players``, ``lines``, ``prices``, ``games`` and ``markets``
+        lists, one entry per outcome. Each market is taken from the first
+        bookmaker that offers it.
+    """
+    r = SESSION.get(f"{BASE}/events/{event_id}/odds",
+                    params={"apiKey": ODDS_KEY,
+                            "regions": "us",
+                            "markets": ",".join(markets)},
+                    timeout=20)
+    r.raise_for_status()
+    players, lines, prices, mkts = [], [], [], []
+    pending = set(markets)
+    data = _json(r)
+    for bk in data.get("bookmakers", []):
+        for m in bk["markets"]:
+            if m["key"] not in pending:
+                continue
+            pending.discard(m["key"])
+            for o in m.get("outcomes", []):
+                players.append(o["description"])
+                lines.append(o["point"])
+                prices.append(o["price"])
+                mkts.append(m["key"])
+        if not pending:
+            break
+    return players, lines, prices, [game_label] * len(players), mkts
+
+
+def player_props(event_id: str, game_label: str, market: str) -> PropColumns:
     """Return player prop lines for a specific market.
 
     Parameters
@@ -81,59 +256,103 @@ def player_props(event_id: str, game_label: str, market: str) -> list[dict]:
 
     Returns
     -------
-    list[dict]
-        Each entry has ``player``, ``line``, ``price``, ``game`` and ``market``
-        keys.
+    PropColumns
+        Parallel ``players``, ``lines``, ``prices``, ``games`` and ``markets``
+        lists, one entry per outcome.
     """
-    r = requests.get(f"{BASE}/events/{event_id}/odds",
-                     params={"apiKey": ODDS_KEY,
-                             "regions": "us",
-                             "markets": market},
-                     timeout=20)
-    r.raise_for_status()
-    rows = []
-    data = r.json()
-    for bk in data.get("bookmakers", []):
-        m = next((m for m in bk["markets"] if m["key"] == market), None)
-        if not m:
-            continue
-        for o in m.get("outcomes", []):
-            rows.append({
-                "player": o["description"],
-                "line":   o["point"],
-                "price":  o["price"],
-                "game":   game_label,
-                "market": market,
-            })
-        break
-    return rows
-
-
-def player_points(event_id: str, game_label: str) -> list[dict]:
+    return player_props_multi(event_id, game_label, (market,))
+
+
+def _prune_odds_cache(today: str) -> None:
+    """Delete odds shards (and stray temp files) left over from earlier dates."""
+    for fname in os.listdir(ODDS_CACHE_DIR):
+        if not fname.startswith(today):
+            try:
+                os.remove(os.path.join(ODDS_CACHE_DIR, fname))
+            except OSError:
+                pass   # already removed by a concurrent writer
+
+
+def cached_player_props(event_id: str, game_label: str, today: str,
+                        markets: tuple[str, ...] = MARKETS) -> tuple[PropColumns, float]:
+    """``player_props_multi`` backed by a short-lived on-disk cache.
+
+    Rows are stored per ``(today, event_id, markets)`` under ``ODDS_CACHE_DIR``
+    and reused for ``ODDS_CACHE_TTL`` seconds, so back-to-back refreshes
+    skip the HTTP call and JSON parse for events fetched moments ago.
+    ``today`` is the UTC date fixed once per refresh by the caller.
+    Returns the columns together with the epoch time they were fetched.
+    """
+    path = os.path.join(ODDS_CACHE_DIR, f"{today}-{event_id}-{'+'.join(markets)}.cols.joblib")
+    try:
+        fetched_at = os.path.getmtime(path)
+    except OSError:
+        fetched_at = None   # no shard yet
+    if fetched_at is not None and time.time() - fetched_at < ODDS_CACHE_TTL:
+        try:
+            return joblib.load(path), fetched_at
+        except Exception:
+            pass   # corrupt or old-format shard (unpickling can raise almost anything): fetch fresh
+
+    cols = player_props_multi(event_id, game_label, markets)
+    os.makedirs(ODDS_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(cols, tmp)
+    os.replace(tmp, path)   # atomic, so readers never see a partial shard
+    return cols, time.time()
+
+
+def player_points(event_id: str, game_label: str) -> PropColumns:
     """Wrapper for ``player_props`` using the ``player_points`` market."""
     return player_props(event_id, game_label, "player_points")
 
 
-def player_rebounds(event_id: str, game_label: str) -> list[dict]:
+def player_rebounds(event_id: str, game_label: str) -> PropColumns:
     """Wrapper for ``player_props`` using the ``player_rebounds`` market."""
     return player_props(event_id, game_label, "player_rebounds")
 
 
-def player_assists(event_id: str, game_label: str) -> list[dict]:
+def player_assists(event_id: str, game_label: str) -> PropColumns:
     """Wrapper for ``player_props`` using the ``player_assists`` market."""
     return player_props(event_id, game_label, "player_assists")
 
-def fetch_live_props() -> pd.DataFrame:
-    """Collect player prop markets for today's games as a DataFrame."""
-    props: list[dict] = []
-    for g in today_events():
-        label = f'{g["away_team"]} @ {g["home_team"]}'
-        props += player_points(g["id"], label)
-        props += player_rebounds(g["id"], label)
-        props += player_assists(g["id"], label)
-    if not props:
+def fetch_live_props() -> tuple[pd.DataFrame, float]:
+    """Collect player prop markets for today's games as a DataFrame.
+
+    Each event's markets come back from one request, and those requests
+    are dispatched on a thread pool so the slate is fetched in a few waves
+    instead of one round-trip at a time. Also returns the epoch time the
+    oldest (possibly cached) shard was fetched.
+    """
+    # fix the cache date once, so no worker can prune a shard another
+    # worker is still writing if the refresh straddles UTC midnight
+    today = datetime.now(timezone.utc).date().isoformat()
+    os.makedirs(ODDS_CACHE_DIR, exist_ok=True)
+    _prune_odds_cache(today)
+
+    tasks = [(g["id"], f'{g["away_team"]} @ {g["home_team"]}', today)
+             for g in today_events()]
+    players, lines, prices, games, markets = [], [], [], [], []
+    fetched_at = time.time()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for (p, l, pr, g, m), shard_time in pool.map(lambda t: cached_player_props(*t), tasks):
+            fetched_at = min(fetched_at, shard_time)
+            players += p
+            lines += l
+            prices += pr
+            games += g
+            markets += m
+    if not players:
         raise SystemExit("No player prop markets for today.")
-    return pd.DataFrame(props)
+    # few distinct values each: categorical codes make the dedupe and the
+    # .str cleaning below work per category instead of per row
+    return pd.DataFrame({
+        "player": pd.Categorical(players),
+        "line":   np.fromiter(lines, dtype=np.float64, count=len(lines)),
+        "price":  np.fromiter(prices, dtype=np.float64, count=len(prices)),
+        "game":   pd.Categorical(games),
+        "market": pd.Categorical(markets),
+    }), fetched_at
 
 # ── Build live feature frame ─────────────────────────────────────────
 def add_features(df: pd.DataFrame) -> pd.DataFrame:
@@ -142,66 +361,81 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
     Uses 'clean_player' as the join key to avoid name mismatches.
     """
     # 1) create cleaned key in live prop dataframe
-    df["clean_player"] = df["player"].apply(clean_name)
+    df["clean_player"] = clean_series(df["player"])
 
-    # 2) prep LAST5 table with same cleaned key
-    last5_clean = LAST5.copy()
-    last5_clean["clean_player"] = last5_clean["PLAYER_NAME"].apply(clean_name)
+    # 2) season-avg lookup (precomputed from TRAIN_LOGS)   --------------
+    df["season_pts"] = df["clean_player"].map(SEASON_PTS_BY_CLEAN).fillna(df["line"])   # fallback for true rookies
 
-    # 3) season-avg lookup (from TRAIN_LOGS)   --------------------------
-    df["season_pts"] = df["clean_player"].map(
-        TRAIN_LOGS.assign(clean_player=lambda t: t["PLAYER_NAME"].apply(clean_name))
-                 .groupby("clean_player").PTS.mean()
-    ).fillna(df["line"])   # fallback for true rookies
+    # 3) rolling-5 averages: map against the key-indexed Series rather than
+    #    merging, so no join table is built per refresh   ----------------
+    df["rolling5"] = df["clean_player"].map(LAST5_CLEAN).fillna(df["season_pts"])
 
-    # 4) merge rolling-5 averages  -------------------------------------
-    df = df.merge(last5_clean[["clean_player", "rolling5_pts"]],
-                  on="clean_player", how="left")
+    # 4) home/away flag  ----------------------------------------------
+    df["home"] = df["game"].str.contains(" @ ", regex=False).astype("int8")
 
-    df["rolling5"] = df["rolling5_pts"].fillna(df["season_pts"])
+    return df.drop(columns=["clean_player"])
 
-    # 5) home/away flag  ----------------------------------------------
-    df["home"] = df["game"].str.contains(r"\s@\s").astype(int)
+def top_edges(df: pd.DataFrame, k: int) -> pd.DataFrame:
+    """Return the ``k`` rows with the largest edge, best first.
 
-    return df.drop(columns=["clean_player", "rolling5_pts"])
+    ``np.partition`` finds the k-th best edge in O(N); only the rows at or
+    above it are then sorted. Ties keep their original row order, matching
+    a stable ``sort_values(...).head(k)``.
+    """
+    neg_edges = -df["edge"].to_numpy()
+    if len(neg_edges) > k:
+        kth = np.partition(neg_edges, k - 1)[k - 1]
+        idx = np.flatnonzero(neg_edges <= kth)   # includes every row tied with the k-th
+    else:
+        idx = np.arange(len(neg_edges))
+    return df.iloc[idx[np.lexsort((idx, neg_edges[idx]))][:k]]
 
 # ── Main ─────────────────────────────────────────────────────────────
 def main():
-    df = fetch_live_props()
+    df, fetched_at = fetch_live_props()
+    # one row per prop before any feature work or predict calls
+    df = df.drop_duplicates(subset=["player", "line", "game", "market"], ignore_index=True)
     df = add_features(df)
 
-    all_predictions = []
-
-    # Generate predictions for each market
-    for market, model, feats in [
+    models = [
         ("player_points", POINTS_MODEL, POINTS_FEATS),
         ("player_rebounds", REBOUNDS_MODEL, REBOUNDS_FEATS),
         ("player_assists", ASSISTS_MODEL, ASSISTS_FEATS),
-    ]:
-        market_df = df[df["market"] == market].copy()
+    ]
 
-        if not market_df.empty:
-            market_df["μ"] = model.predict(market_df[feats])
-            market_df["edge"] = market_df["μ"] - market_df["line"]
-            market_df["conf"] = (market_df["edge"].abs() * 10 + 50).clip(0, 100).round().astype(int)
-            market_df["prop"] = f"{market.split('_')[1].upper()} O " + market_df["line"].astype(str)
+    # cast the feature columns to float32 once, then take one masked slice
+    # per market (instead of a full-frame .copy() per market)
+    feats_union = list(dict.fromkeys(f for _, _, feats in models for f in feats))
+    X = df[feats_union].astype(np.float32)
+    market_col = df["market"].to_numpy()
+    df["μ"] = np.nan
 
-            all_predictions.append(market_df)
+    # Generate predictions for each market
+    for market, model, feats in models:
+        mask = market_col == market
+        if mask.any():
+            df.loc[mask, "μ"] = predict(model, X.loc[mask, feats])
 
-    if not all_predictions:
+    df = df[df["μ"].notna()].reset_index(drop=True)
+    if df.empty:
         logging.info("No predictions generated for any market.")
         return
 
-    all_predictions_df = pd.concat(all_predictions, ignore_index=True)
-    top = all_predictions_df.sort_values("edge", ascending=False).head(20)
+    df["edge"] = df["μ"] - df["line"]
+    df["conf"] = (df["edge"].abs() * 10 + 50).clip(0, 100).round().astype("int8")
+    df["prop"] = (df["market"].str.split("_").str[1].str.upper()
+                  + " O " + df["line"].astype(str))
+
+    top = top_edges(df, 20)
 
     # show results in a simple table and JSON block
     logging.info("\n%s\n%s",
                  top.to_markdown(index=False, floatfmt=".1f"),
                  top.to_json(orient="records", indent=2))
 
-    ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    logging.info("\nData refreshed: %s UTC", ts)
+    ts = datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(timespec="seconds")
+    logging.info("\nOdds as of: %s UTC (oldest shard %ds old)",
+                 ts, time.time() - fetched_at)
     logging.info("\nPredictions are for informational purposes only. Bet responsibly.")
 
 if __name__ == "__main__":
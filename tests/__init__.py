@@ -0,0 +1,24 @@
+import ast
+from pathlib import Path
+import re
+
+
+def load_function(name, ns=None):
+    """Load a function (or class) from refresh.py without executing the module."""
+    refresh_path = Path(__file__).resolve().parents[1] / "refresh.py"
+    source = refresh_path.read_text()
+    tree = ast.parse(source)
+    ns = {"re": re, **(ns or {})}
+    # module-level private constants (compiled regexes etc.) the helpers use
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and all(
+                isinstance(t, ast.Name) and t.id.startswith("_") for t in node.targets):
+            exec(ast.get_source_segment(source, node), ns)
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.name == name:
+            code = ast.get_source_segment(source, node)
+            break
+    else:
+        raise AssertionError(f"{name} not found")
+    exec(code, ns)
+    return ns[name]
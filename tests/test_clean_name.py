@@ -1,24 +1,9 @@
-import ast
-from pathlib import Path
-import re
-
-
-def load_clean_name():
-    """Load clean_name function from refresh.py without executing the module."""
-    refresh_path = Path(__file__).resolve().parents[1] / "refresh.py"
-    source = refresh_path.read_text()
-    tree = ast.parse(source)
-    for node in tree.body:
-        if isinstance(node, ast.FunctionDef) and node.name == "clean_name":
-            code = ast.get_source_segment(source, node)
-            break
-    else:
-        raise AssertionError("clean_name not found")
-    ns = {"re": re}
-    exec(code, ns)
-    return ns["clean_name"]
-
-clean_name = load_clean_name()
+import pytest
+
+from tests import load_function
+
+
+clean_name = load_function("clean_name")
 
 def test_parenthetical():
     assert clean_name("LeBron James (LAL)") == "lebron james"
@@ -28,3 +13,17 @@ def test_period_initial():
 
 def test_punctuation():
     assert clean_name("D'Angelo Russell!") == "dangelo russell"
+
+def test_unbalanced_parentheses():
+    assert clean_name("Kevin Durant (PHX") == "kevin durant phx"
+    assert clean_name("Jimmy Butler) (MIA)") == "jimmy butler"
+
+def test_non_ascii():
+    assert clean_name("Nikola Jokić") == "nikola joki"
+    assert clean_name("Luka Dončić (DAL)") == "luka doni"
+
+def test_clean_series_matches_clean_name():
+    pd = pytest.importorskip("pandas")
+    clean_series = load_function("clean_series", {"pd": pd})
+    names = ["LeBron James (LAL)", "Kevin Durant (PHX", "J. Harden", "D'Angelo Russell!", "  Nikola Jokić ", "Luka Dončić (DAL)"]
+    assert clean_series(pd.Series(names)).tolist() == [clean_name(n) for n in names]
@@ -0,0 +1,91 @@
+import logging
+import os
+import zipfile
+from typing import NamedTuple
+
+import pytest
+
+from tests import load_function
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+joblib = pytest.importorskip("joblib")
+linear_model = pytest.importorskip("sklearn.linear_model")
+
+ns = {"os": os, "np": np, "pd": pd, "joblib": joblib, "NamedTuple": NamedTuple,
+      "logging": logging, "zipfile": zipfile}
+ns["LinearModel"] = load_function("LinearModel", ns)
+load_model = load_function("load_model", ns)
+predict = load_function("predict", ns)
+
+FEATS = ["season_pts", "rolling5", "home"]
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("models")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 30, size=(50, 3)), columns=FEATS)
+    y = X @ np.array([0.4, 0.5, 1.0]) + rng.normal(0, 1, size=50) + 2.0
+    return X, y
+
+
+def test_bayesian_ridge_npz_round_trip(data):
+    X, y = data
+    fitted = linear_model.BayesianRidge().fit(X, y)
+    joblib.dump({"model": fitted, "features": FEATS}, "models/player_points.joblib")
+
+    exported, feats = load_model("player_points")
+    assert isinstance(exported, ns["LinearModel"]) and feats == FEATS
+    assert os.path.exists("models/player_points.npz")
+
+    reloaded, feats = load_model("player_points")   # now served from the .npz
+    assert isinstance(reloaded, ns["LinearModel"]) and feats == FEATS
+    np.testing.assert_allclose(predict(reloaded, X), fitted.predict(X), rtol=1e-5)
+
+
+def test_truncated_npz_falls_back_to_bundle(data):
+    X, y = data
+    fitted = linear_model.BayesianRidge().fit(X, y)
+    joblib.dump({"model": fitted, "features": FEATS}, "models/player_points.joblib")
+    load_model("player_points")
+
+    with open("models/player_points.npz", "r+b") as f:   # interrupted write
+        f.truncate(os.path.getsize("models/player_points.npz") // 2)
+
+    model, feats = load_model("player_points")
+    assert feats == FEATS
+    np.testing.assert_allclose(predict(model, X), fitted.predict(X), rtol=1e-5)
+    with np.load("models/player_points.npz") as params:   # re-exported intact
+        assert params["features"].tolist() == FEATS
+
+
+def test_failed_export_keeps_in_memory_model(data, monkeypatch):
+    X, y = data
+    fitted = linear_model.BayesianRidge().fit(X, y)
+    joblib.dump({"model": fitted, "features": FEATS}, "models/player_points.joblib")
+
+    def read_only(*a, **k):
+        raise PermissionError("read-only file system")
+    monkeypatch.setattr(np, "savez", read_only)
+
+    model, feats = load_model("player_points")
+    assert isinstance(model, ns["LinearModel"]) and feats == FEATS
+    assert os.listdir("models") == ["player_points.joblib"]
+    np.testing.assert_allclose(predict(model, X), fitted.predict(X), rtol=1e-5)
+
+
+@pytest.mark.parametrize("make_model, target", [
+    (lambda: linear_model.PoissonRegressor(), lambda y: y),                 # exp link
+    (lambda: linear_model.Ridge(), lambda y: np.column_stack([y, 2 * y])),  # 2-D coef_
+])
+def test_non_affine_models_are_not_exported(data, make_model, target):
+    X, y = data
+    fitted = make_model().fit(X, target(y))
+    joblib.dump({"model": fitted, "features": FEATS}, "models/player_points.joblib")
+
+    model, _ = load_model("player_points")
+    assert not isinstance(model, ns["LinearModel"])
+    assert not os.path.exists("models/player_points.npz")
+    np.testing.assert_allclose(predict(model, X), fitted.predict(X))
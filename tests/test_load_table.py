@@ -0,0 +1,47 @@
+import logging
+import os
+
+import pytest
+
+from tests import load_function
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+load_table = load_function("load_table", {"os": os, "pd": pd, "logging": logging})
+
+
+@pytest.fixture
+def parquet(tmp_path):
+    path = tmp_path / "player_logs.parquet"
+    pd.DataFrame({"PLAYER_NAME": ["A", "B", "A"], "PTS": [10, 20, 30]}).to_parquet(path)
+    return str(path)
+
+
+def test_creates_categorical_feather_copy(parquet):
+    df = load_table(parquet)
+    assert isinstance(df["PLAYER_NAME"].dtype, pd.CategoricalDtype)
+    assert os.path.exists(parquet.replace(".parquet", ".feather"))
+    assert not [f for f in os.listdir(os.path.dirname(parquet)) if f.endswith(".tmp")]
+
+
+def test_reuses_fresh_feather(parquet, monkeypatch):
+    load_table(parquet)
+    monkeypatch.setattr(pd, "read_parquet", lambda *a, **k: pytest.fail("parquet re-read"))
+    assert load_table(parquet)["PTS"].tolist() == [10, 20, 30]
+
+
+def test_rebuilds_when_parquet_is_newer(parquet):
+    load_table(parquet)
+    feather = parquet.replace(".parquet", ".feather")
+    pd.DataFrame({"PLAYER_NAME": ["C"], "PTS": [5]}).to_parquet(parquet)
+    os.utime(feather, (0, 0))
+    assert load_table(parquet)["PLAYER_NAME"].tolist() == ["C"]
+
+
+def test_falls_back_when_feather_write_fails(parquet, monkeypatch):
+    def fail(*a, **k):
+        raise OSError("read-only file system")
+    monkeypatch.setattr(pd.DataFrame, "to_feather", fail)
+    assert load_table(parquet)["PTS"].tolist() == [10, 20, 30]
+    assert not os.path.exists(parquet.replace(".parquet", ".feather"))
@@ -0,0 +1,101 @@
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+from tests import load_function
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+joblib = pytest.importorskip("joblib")
+
+MARKETS = ("player_points", "player_rebounds", "player_assists")
+TODAY = "2026-10-15"
+COLS = (["A Player"], [20.5], [1.9], ["X @ Y"], ["player_points"])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Load the odds-cache helpers against a temp dir and a mocked fetch."""
+    calls = []
+
+    def player_props_multi(event_id, game_label, markets):
+        calls.append(event_id)
+        return COLS
+
+    ns = {"os": os, "time": time, "joblib": joblib,
+          "ODDS_CACHE_DIR": str(tmp_path / "odds"), "ODDS_CACHE_TTL": 300,
+          "MARKETS": MARKETS, "PropColumns": tuple,
+          "player_props_multi": player_props_multi}
+    ns["cached_player_props"] = load_function("cached_player_props", ns)
+    ns["_prune_odds_cache"] = load_function("_prune_odds_cache", ns)
+    ns["calls"] = calls
+    return ns
+
+
+def shard_path(cache, event_id="e1"):
+    return os.path.join(cache["ODDS_CACHE_DIR"], f"{TODAY}-{event_id}-{'+'.join(MARKETS)}.cols.joblib")
+
+
+def test_fresh_shard_is_reused(cache):
+    cols, fetched_at = cache["cached_player_props"]("e1", "X @ Y", TODAY)
+    assert cols == COLS and abs(time.time() - fetched_at) < 5
+    assert os.path.exists(shard_path(cache))
+
+    os.utime(shard_path(cache), (time.time() - 60, time.time() - 60))
+    cols, fetched_at = cache["cached_player_props"]("e1", "X @ Y", TODAY)
+    assert cols == COLS
+    assert fetched_at == os.path.getmtime(shard_path(cache))
+    assert cache["calls"] == ["e1"]
+
+
+def test_expired_shard_is_refetched(cache):
+    cache["cached_player_props"]("e1", "X @ Y", TODAY)
+    os.utime(shard_path(cache), (time.time() - 301, time.time() - 301))
+    cache["cached_player_props"]("e1", "X @ Y", TODAY)
+    assert cache["calls"] == ["e1", "e1"]
+
+
+@pytest.mark.parametrize("payload", [b"", b"not a pickle", pickle.dumps(COLS)[:10]])
+def test_corrupt_shard_is_refetched(cache, payload):
+    os.makedirs(cache["ODDS_CACHE_DIR"])
+    with open(shard_path(cache), "wb") as f:
+        f.write(payload)
+    cols, _ = cache["cached_player_props"]("e1", "X @ Y", TODAY)
+    assert cols == COLS and cache["calls"] == ["e1"]
+    assert joblib.load(shard_path(cache)) == COLS
+
+
+def test_prune_keeps_only_today(cache):
+    odds = cache["ODDS_CACHE_DIR"]
+    os.makedirs(odds)
+    for fname in (f"{TODAY}-e1.cols.joblib", f"{TODAY}-e2.cols.joblib.123.tmp",
+                  "2026-10-14-e1.cols.joblib", "2026-10-14-e2.cols.joblib.456.tmp"):
+        open(os.path.join(odds, fname), "w").close()
+    cache["_prune_odds_cache"](TODAY)
+    assert sorted(os.listdir(odds)) == [f"{TODAY}-e1.cols.joblib", f"{TODAY}-e2.cols.joblib.123.tmp"]
+
+
+def test_fetch_live_props_prunes_once_and_reports_oldest_shard(tmp_path):
+    prunes, seen_today = [], set()
+    shard_times = {"e1": 1000.0, "e2": 900.0, "e3": 950.0}
+
+    def cached_player_props(event_id, game_label, today):
+        seen_today.add(today)
+        return ([f"{event_id} player"], [10.5], [1.9], [game_label], ["player_points"]), shard_times[event_id]
+
+    fetch_live_props = load_function("fetch_live_props", {
+        "os": os, "time": time, "np": np, "pd": pd,
+        "datetime": datetime, "timezone": timezone, "ThreadPoolExecutor": ThreadPoolExecutor,
+        "MAX_WORKERS": 4, "ODDS_CACHE_DIR": str(tmp_path / "odds"),
+        "_prune_odds_cache": prunes.append,
+        "today_events": lambda: [{"id": e, "away_team": "X", "home_team": "Y"} for e in shard_times],
+        "cached_player_props": cached_player_props,
+    })
+    df, fetched_at = fetch_live_props()
+    assert fetched_at == 900.0
+    assert len(prunes) == 1 and seen_today == set(prunes)
+    assert df["player"].tolist() == ["e1 player", "e2 player", "e3 player"]
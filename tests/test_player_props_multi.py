@@ -0,0 +1,72 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from tests import load_function
+
+orjson = pytest.importorskip("orjson")
+
+MARKETS = ("player_points", "player_rebounds", "player_assists")
+
+
+def outcome(player, point):
+    return {"name": "Over", "description": player, "point": point, "price": 1.9}
+
+
+PAYLOAD = {"bookmakers": [
+    {"key": "book_a", "markets": [
+        {"key": "player_points", "outcomes": [outcome("A Player", 20.5), outcome("B Player", 15.5)]},
+    ]},
+    {"key": "book_b", "markets": [
+        {"key": "player_points", "outcomes": [outcome("A Player", 21.5)]},     # duplicate market
+        {"key": "player_rebounds", "outcomes": [outcome("A Player", 7.5)]},
+    ]},
+    {"key": "book_c", "markets": [
+        {"key": "player_rebounds", "outcomes": [outcome("A Player", 8.5)]},    # duplicate market
+        {"key": "player_assists", "outcomes": [outcome("B Player", 4.5)]},
+    ]},
+    {"key": "book_d", "markets": [
+        {"key": "player_assists", "outcomes": [outcome("B Player", 5.5)]},     # after all found
+    ]},
+]}
+
+
+@pytest.fixture
+def player_props_multi():
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(params)
+        return SimpleNamespace(raise_for_status=lambda: None,
+                               content=json.dumps(PAYLOAD).encode())
+
+    fn = load_function("player_props_multi", {
+        "SESSION": SimpleNamespace(get=get), "BASE": "https://example.test",
+        "ODDS_KEY": "key", "MARKETS": MARKETS, "PropColumns": tuple,
+        "_json": lambda r: orjson.loads(r.content),
+    })
+    fn.calls = calls
+    return fn
+
+
+def test_each_market_from_first_bookmaker(player_props_multi):
+    players, lines, prices, games, markets = player_props_multi("e1", "X @ Y")
+    assert list(zip(players, lines, markets)) == [
+        ("A Player", 20.5, "player_points"),
+        ("B Player", 15.5, "player_points"),
+        ("A Player", 7.5, "player_rebounds"),
+        ("B Player", 4.5, "player_assists"),
+    ]
+    assert prices == [1.9] * 4
+    assert games == ["X @ Y"] * 4
+
+
+def test_single_request_with_joined_markets(player_props_multi):
+    player_props_multi("e1", "X @ Y")
+    assert [c["markets"] for c in player_props_multi.calls] == [",".join(MARKETS)]
+
+
+def test_unrequested_markets_are_ignored(player_props_multi):
+    _, lines, _, _, markets = player_props_multi("e1", "X @ Y", ("player_rebounds",))
+    assert list(zip(lines, markets)) == [(7.5, "player_rebounds")]
@@ -0,0 +1,27 @@
+import pytest
+
+from tests import load_function
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+top_edges = load_function("top_edges", {"np": np, "pd": pd})
+
+
+@pytest.mark.parametrize("k", [1, 5, 9, 10, 20])
+def test_matches_sort_values(k):
+    df = pd.DataFrame({"edge": [0.5, -2.0, 3.1, 1.2, 3.1, 0.0, -0.7, 2.4, 1.9, -1.1]})
+    expected = df.sort_values("edge", ascending=False, kind="stable").head(k)
+    assert top_edges(df, k)["edge"].tolist() == expected["edge"].tolist()
+
+
+def test_ties_keep_row_order():
+    df = pd.DataFrame({"edge": [1.0, 2.0, 1.0, 2.0, 1.0, 0.5, 1.0],
+                       "row":  [0, 1, 2, 3, 4, 5, 6]})
+    for k in range(1, len(df) + 1):
+        expected = df.sort_values("edge", ascending=False, kind="stable").head(k)
+        assert top_edges(df, k)["row"].tolist() == expected["row"].tolist()
+
+
+def test_empty_frame():
+    assert top_edges(pd.DataFrame({"edge": []}), 20).empty